@@ -15,18 +15,26 @@ Usage:
 
 import argparse
 import json
+import shlex
 import subprocess
 import sys
+import threading
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 import requests
 import paramiko
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from pathlib import Path
 
 class RaspberryPiCluster:
     """Manages deployment and operations of RAC-NAS on Raspberry Pi cluster."""
     
+    # Name of the transient systemd user unit each node runs under
+    SERVICE_UNIT = "rac-nas"
+    
     def __init__(self, config_file: str):
         """Initialize cluster manager with configuration file."""
         self.config_file = config_file
@@ -36,6 +44,23 @@ class RaspberryPiCluster:
         self.username = self.config.get("username", "pi")
         self.project_path = self.config.get("remote_project_path", "/home/pi/Resilient-Access-Control")
         
+        # Decode the private key once instead of on every connect
+        self._pkey = self._load_private_key()
+        
+        # One authenticated SSH session per Pi, reused across commands
+        self._ssh_pool: Dict[tuple, paramiko.SSHClient] = {}
+        self._ssh_lock = threading.Lock()
+        
+        # Keep-alive HTTP session shared by status probes and cluster tests
+        self.http = requests.Session()
+        self.http.headers["Connection"] = "keep-alive"
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=1, backoff_factor=0.1)
+        )
+        self.http.mount("http://", adapter)
+        
     def _load_config(self) -> Dict:
         """Load cluster configuration from JSON file."""
         try:
@@ -83,26 +108,83 @@ class RaspberryPiCluster:
         print(f"📝 Created sample configuration: {sample_file}")
         print("   Please copy and modify it to match your Raspberry Pi setup.")
     
+    def _load_private_key(self) -> Optional[paramiko.PKey]:
+        """Load the configured SSH private key, or None if it can't be decoded here."""
+        path = os.path.expanduser(self.ssh_key)
+        for key_class in (paramiko.Ed25519Key, paramiko.ECDSAKey, paramiko.RSAKey):
+            try:
+                return key_class.from_private_key_file(path)
+            except (paramiko.SSHException, OSError, ValueError):
+                continue
+        return None
+    
     def _ssh_connect(self, ip: str) -> paramiko.SSHClient:
         """Establish SSH connection to a Raspberry Pi."""
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         
+        if self._pkey is not None:
+            auth = {"pkey": self._pkey, "look_for_keys": False, "allow_agent": False}
+        else:
+            # Passphrase-protected or missing key: let paramiko/agent handle it
+            auth = {"key_filename": os.path.expanduser(self.ssh_key)}
+        
         try:
             ssh.connect(
                 hostname=ip,
                 username=self.username,
-                key_filename=os.path.expanduser(self.ssh_key),
-                timeout=10
+                timeout=10,
+                banner_timeout=10,
+                auth_timeout=10,
+                **auth
             )
             return ssh
         except Exception as e:
             print(f"❌ Failed to connect to {ip}: {e}")
             return None
     
+    def _get_ssh(self, ip: str) -> Optional[paramiko.SSHClient]:
+        """Return a pooled SSH connection to a Raspberry Pi, reconnecting if it dropped."""
+        key = (ip, self.username)
+        with self._ssh_lock:
+            ssh = self._ssh_pool.get(key)
+            if ssh is not None:
+                transport = ssh.get_transport()
+                if transport is not None and transport.is_active():
+                    return ssh
+                ssh.close()
+                del self._ssh_pool[key]
+        
+        # Connect without the lock so a slow Pi doesn't stall the others
+        ssh = self._ssh_connect(ip)
+        if ssh is None:
+            return None
+        with self._ssh_lock:
+            pooled = self._ssh_pool.setdefault(key, ssh)
+        if pooled is not ssh:
+            # another thread connected to the same Pi first
+            ssh.close()
+        return pooled
+    
+    def _drop_ssh(self, ip: str) -> None:
+        """Close and forget the pooled connection to a Raspberry Pi."""
+        with self._ssh_lock:
+            ssh = self._ssh_pool.pop((ip, self.username), None)
+        if ssh:
+            ssh.close()
+    
+    def close_all(self) -> None:
+        """Close every pooled SSH connection and the HTTP session."""
+        with self._ssh_lock:
+            connections = list(self._ssh_pool.values())
+            self._ssh_pool.clear()
+        for ssh in connections:
+            ssh.close()
+        self.http.close()
+    
     def _run_remote_command(self, ip: str, command: str) -> tuple:
         """Execute a command on a remote Raspberry Pi."""
-        ssh = self._ssh_connect(ip)
+        ssh = self._get_ssh(ip)
         if not ssh:
             return False, "", "SSH connection failed"
         
@@ -111,55 +193,92 @@ class RaspberryPiCluster:
             exit_code = stdout.channel.recv_exit_status()
             stdout_str = stdout.read().decode('utf-8')
             stderr_str = stderr.read().decode('utf-8')
-            ssh.close()
             return exit_code == 0, stdout_str, stderr_str
         except Exception as e:
-            ssh.close()
+            # The session is in an unknown state; reconnect on next use
+            self._drop_ssh(ip)
             return False, "", str(e)
     
+    def _for_each_node(self, fn):
+        """Run fn(node_name, node_config) for every node concurrently.
+        
+        Yields (node_name, result) pairs in completion order. The per-node
+        work is SSH/HTTP bound, so threads overlap the network waits.
+        """
+        if not self.nodes:
+            return
+        with ThreadPoolExecutor(max_workers=min(32, len(self.nodes))) as executor:
+            futures = {
+                executor.submit(fn, node_name, node_config): node_name
+                for node_name, node_config in self.nodes.items()
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
     def deploy_to_cluster(self):
         """Deploy the RAC-NAS system to all Raspberry Pis in the cluster."""
         print("🚀 Starting deployment to Raspberry Pi cluster...")
         
-        # Step 1: Copy project files to each node
-        for node_name, node_config in self.nodes.items():
-            ip = node_config["ip"]
-            print(f"📦 Deploying to {node_name} ({ip})...")
-            
-            if not self._copy_project_files(ip):
-                print(f"❌ Failed to copy files to {node_name}")
-                continue
-            
-            if not self._install_dependencies(ip):
-                print(f"❌ Failed to install dependencies on {node_name}")
-                continue
-                
-            print(f"✅ Successfully deployed to {node_name}")
+        for node_name, message in self._for_each_node(self._deploy_one):
+            print(message)
         
         print("📋 Deployment completed! Use 'start-cluster' to begin the cluster.")
     
+    def _deploy_one(self, node_name: str, node_config: Dict) -> str:
+        """Copy files and install dependencies on a single node."""
+        ip = node_config["ip"]
+        print(f"📦 Deploying to {node_name} ({ip})...")
+        
+        if not self._copy_project_files(ip):
+            return f"❌ Failed to copy files to {node_name}"
+        
+        if not self._install_dependencies(ip):
+            return f"❌ Failed to install dependencies on {node_name}"
+        
+        return f"✅ Successfully deployed to {node_name}"
+    
     def _copy_project_files(self, ip: str) -> bool:
         """Copy project files to a Raspberry Pi using rsync."""
         current_dir = os.getcwd()
         
-        # Use rsync to copy files (more efficient than scp for directories)
+        # Whole-file, in-place, uncompressed transfer: the LAN is rarely the
+        # bottleneck, the Pi's CPU and SD card are
         rsync_cmd = [
-            "rsync", "-avz", "--delete",
-            "--exclude=__pycache__",
-            "--exclude=.git",
-            "--exclude=*.pyc",
-            "--exclude=.venv",
+            "rsync", "-a", "--delete",
+            "--no-compress", "--whole-file", "--inplace",
+        ]
+        ignore_file = os.path.join(current_dir, ".rsyncignore")
+        if os.path.isfile(ignore_file):
+            rsync_cmd.append(f"--exclude-from={ignore_file}")
+        else:
+            rsync_cmd += [
+                "--exclude=__pycache__",
+                "--exclude=.git",
+                "--exclude=*.pyc",
+                "--exclude=.venv",
+            ]
+        rsync_cmd += [
             f"{current_dir}/",
             f"{self.username}@{ip}:{self.project_path}/"
         ]
         
         try:
-            result = subprocess.run(rsync_cmd, capture_output=True, text=True)
-            if result.returncode == 0:
+            # Stream rsync output instead of buffering it all in memory
+            proc = subprocess.Popen(
+                rsync_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+            for line in proc.stdout:
+                print(f"    [{ip}] {line.rstrip()}")
+            returncode = proc.wait()
+            if returncode == 0:
                 print(f"  ✓ Files copied to {ip}")
                 return True
             else:
-                print(f"  ❌ rsync failed: {result.stderr}")
+                print(f"  ❌ rsync failed with exit code {returncode}")
                 return False
         except Exception as e:
             print(f"  ❌ Error copying files: {e}")
@@ -167,18 +286,23 @@ class RaspberryPiCluster:
     
     def _install_dependencies(self, ip: str) -> bool:
         """Install Python dependencies on a Raspberry Pi."""
-        commands = [
-            "sudo apt update",
-            "sudo apt install -y python3-pip",
-            f"cd {self.project_path} && pip3 install -r requirements-main.txt"
-        ]
+        # One shell script means one SSH channel instead of one per step
+        script = "\n".join([
+            "set -euo pipefail",
+            "sudo apt-get -o Dpkg::Use-Pty=0 update",
+            "sudo DEBIAN_FRONTEND=noninteractive apt-get -o Dpkg::Use-Pty=0 install -y python3-pip",
+            # keep the user's systemd manager (and the node unit) alive
+            # after the deploying SSH session logs out
+            'sudo loginctl enable-linger "$USER"',
+            f"cd {shlex.quote(self.project_path)}",
+            "pip3 install --no-warn-script-location -r requirements-main.txt",
+        ])
         
-        for cmd in commands:
-            success, stdout, stderr = self._run_remote_command(ip, cmd)
-            if not success:
-                print(f"  ❌ Command failed: {cmd}")
-                print(f"     Error: {stderr}")
-                return False
+        success, stdout, stderr = self._run_remote_command(ip, f"bash -c {shlex.quote(script)}")
+        if not success:
+            print(f"  ❌ Dependency installation failed on {ip}")
+            print(f"     Error: {stderr}")
+            return False
         
         print(f"  ✓ Dependencies installed on {ip}")
         return True
@@ -187,22 +311,24 @@ class RaspberryPiCluster:
         """Start the RAC-NAS cluster on all Raspberry Pis."""
         print("🔄 Starting RAC-NAS cluster...")
         
-        # Generate partner addresses for each node
-        all_addresses = [f"{node['ip']}:{node['port']}" for node in self.nodes.values()]
+        # Raft address and partner list (all nodes except itself) per node
+        addresses = {
+            name: f"{node['ip']}:{node['port']}" for name, node in self.nodes.items()
+        }
+        partners = {
+            name: ",".join(addr for other, addr in addresses.items() if other != name)
+            for name in addresses
+        }
         
-        for node_name, node_config in self.nodes.items():
+        def start_one(node_name, node_config):
             ip = node_config["ip"]
-            port = node_config["port"]
             api_port = node_config["api_port"]
             
-            # Create partner list (all nodes except current)
-            self_addr = f"{ip}:{port}"
-            partner_addrs = [addr for addr in all_addresses if addr != self_addr]
-            partners_str = ",".join(partner_addrs)
-            
-            # Start the node
             print(f"🚀 Starting {node_name} ({ip})...")
-            if self._start_node(ip, self_addr, partners_str, api_port):
+            return self._start_node(ip, addresses[node_name], partners[node_name], api_port)
+        
+        for node_name, started in self._for_each_node(start_one):
+            if started:
                 print(f"  ✓ {node_name} started successfully")
             else:
                 print(f"  ❌ Failed to start {node_name}")
@@ -215,23 +341,41 @@ class RaspberryPiCluster:
         self.check_cluster_status()
     
     def _start_node(self, ip: str, self_addr: str, partners: str, api_port: int) -> bool:
-        """Start a single RAC-NAS node on a Raspberry Pi."""
+        """Start a single RAC-NAS node on a Raspberry Pi as a transient systemd user unit."""
+        unit = self.SERVICE_UNIT
         
-        # Stop any existing instance first
-        stop_cmd = f"pkill -f 'python3.*main.py' || true"
-        self._run_remote_command(ip, stop_cmd)
+        # systemd tracks the previous instance, so stopping it is a single
+        # signal. The pkill only catches a node left over from the old nohup
+        # launch, which would otherwise hold the ports and crash-loop the
+        # unit. It runs in its own command: pkill -f matches full command
+        # lines, so sharing a shell with the systemd-run line below would
+        # kill that shell; "[.]" keeps the pattern from matching itself.
+        stop_cmd = (
+            f"loginctl show-user \"$USER\" -p Linger --value | grep -qx yes || "
+            f"{{ echo 'linger is off; run deploy first' >&2; exit 1; }}; "
+            f"systemctl --user stop {unit} 2>/dev/null || true; "
+            f"pkill -f 'python3 -m src[.]app[.]main' || true"
+        )
+        success, stdout, stderr = self._run_remote_command(ip, stop_cmd)
+        if not success:
+            print(f"  ❌ Failed to start node: {stderr}")
+            return False
         
-        # Start the node in background
         start_cmd = (
-            f"cd {self.project_path} && "
-            f"SELF_ADDR='{self_addr}' PARTNERS='{partners}' "
-            f"nohup python3 -m src.app.main > rac_node.log 2>&1 & echo $!"
+            f"systemctl --user reset-failed {unit} 2>/dev/null || true; "
+            f"systemd-run --user --unit={unit} "
+            f"-p Restart=on-failure -p KillMode=mixed "
+            f"-E SELF_ADDR={shlex.quote(self_addr)} -E PARTNERS={shlex.quote(partners)} "
+            f"--working-directory={shlex.quote(self.project_path)} "
+            f"python3 -m src.app.main && "
+            f"systemctl --user show {unit} -p MainPID --value"
         )
         
         success, stdout, stderr = self._run_remote_command(ip, start_cmd)
-        if success and stdout.strip().isdigit():
-            pid = stdout.strip()
-            print(f"  ✓ Node started with PID {pid}")
+        lines = stdout.strip().splitlines()
+        pid = lines[-1].strip() if lines else ""
+        if success and pid.isdigit() and pid != "0":
+            print(f"  ✓ Node started with PID {pid} (logs: journalctl --user -u {unit})")
             return True
         else:
             print(f"  ❌ Failed to start node: {stderr}")
@@ -241,37 +385,43 @@ class RaspberryPiCluster:
         """Stop all RAC-NAS nodes in the cluster."""
         print("🛑 Stopping RAC-NAS cluster...")
         
-        for node_name, node_config in self.nodes.items():
-            ip = node_config["ip"]
-            print(f"🛑 Stopping {node_name} ({ip})...")
-            
-            stop_cmd = "pkill -f 'python3.*main.py'"
-            success, stdout, stderr = self._run_remote_command(ip, stop_cmd)
-            
-            if success or "no process found" in stderr.lower():
-                print(f"  ✓ {node_name} stopped")
-            else:
-                print(f"  ❌ Error stopping {node_name}: {stderr}")
+        for node_name, message in self._for_each_node(self._stop_node):
+            print(message)
+    
+    def _stop_node(self, node_name: str, node_config: Dict) -> str:
+        """Stop the RAC-NAS process on a single node."""
+        ip = node_config["ip"]
+        print(f"🛑 Stopping {node_name} ({ip})...")
+        
+        stop_cmd = f"systemctl --user stop {self.SERVICE_UNIT}"
+        success, stdout, stderr = self._run_remote_command(ip, stop_cmd)
+        
+        if success or "not loaded" in stderr.lower():
+            return f"  ✓ {node_name} stopped"
+        return f"  ❌ Error stopping {node_name}: {stderr}"
     
     def check_cluster_status(self):
         """Check the status of all nodes in the cluster."""
         print("📊 Checking cluster status...")
         
-        for node_name, node_config in self.nodes.items():
-            ip = node_config["ip"]
-            api_port = node_config.get("api_port", 5000)
-            
-            try:
-                response = requests.get(f"http://{ip}:{api_port}/graph", timeout=5)
-                if response.status_code == 200:
-                    graph_data = response.json()
-                    node_count = len(graph_data.get("nodes", []))
-                    edge_count = len(graph_data.get("edges", []))
-                    print(f"  ✅ {node_name} ({ip}): Online - {node_count} nodes, {edge_count} edges")
-                else:
-                    print(f"  ❌ {node_name} ({ip}): HTTP {response.status_code}")
-            except requests.exceptions.RequestException as e:
-                print(f"  ❌ {node_name} ({ip}): Offline - {e}")
+        for node_name, message in self._for_each_node(self._node_status):
+            print(message)
+    
+    def _node_status(self, node_name: str, node_config: Dict) -> str:
+        """Probe a single node's /graph endpoint and describe the result."""
+        ip = node_config["ip"]
+        api_port = node_config.get("api_port", 5000)
+        
+        try:
+            response = self.http.get(f"http://{ip}:{api_port}/graph", timeout=5)
+            if response.status_code == 200:
+                graph_data = response.json()
+                node_count = len(graph_data.get("nodes", []))
+                edge_count = len(graph_data.get("edges", []))
+                return f"  ✅ {node_name} ({ip}): Online - {node_count} nodes, {edge_count} edges"
+            return f"  ❌ {node_name} ({ip}): HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            return f"  ❌ {node_name} ({ip}): Offline - {e}"
     
     def test_cluster(self):
         """Run basic functionality tests on the cluster."""
@@ -284,8 +434,8 @@ class RaspberryPiCluster:
         try:
             # Test 1: Add a subject
             print("  📤 Adding test subject...")
-            response = requests.post(f"{api_url}/subject", 
-                                   json={"id": "test_user"}, timeout=10)
+            response = self.http.post(f"{api_url}/subject", 
+                                      json={"id": "test_user"}, timeout=10)
             if response.status_code == 201:
                 print("    ✓ Subject added successfully")
             else:
@@ -294,8 +444,8 @@ class RaspberryPiCluster:
             
             # Test 2: Add an object
             print("  📁 Adding test object...")
-            response = requests.post(f"{api_url}/object", 
-                                   json={"id": "test_file.txt"}, timeout=10)
+            response = self.http.post(f"{api_url}/object", 
+                                      json={"id": "test_file.txt"}, timeout=10)
             if response.status_code == 201:
                 print("    ✓ Object added successfully")
             else:
@@ -311,7 +461,7 @@ class RaspberryPiCluster:
                 api_port = node_config.get("api_port", 5000)
                 
                 try:
-                    response = requests.get(f"http://{ip}:{api_port}/graph", timeout=5)
+                    response = self.http.get(f"http://{ip}:{api_port}/graph", timeout=5)
                     if response.status_code == 200:
                         graph_data = response.json()
                         nodes = [n["id"] for n in graph_data.get("nodes", [])]
@@ -343,16 +493,19 @@ def main():
     
     cluster = RaspberryPiCluster(args.config)
     
-    if args.action == "deploy":
-        cluster.deploy_to_cluster()
-    elif args.action == "start-cluster":
-        cluster.start_cluster()
-    elif args.action == "stop-cluster":
-        cluster.stop_cluster()
-    elif args.action == "status":
-        cluster.check_cluster_status()
-    elif args.action == "test":
-        cluster.test_cluster()
+    try:
+        if args.action == "deploy":
+            cluster.deploy_to_cluster()
+        elif args.action == "start-cluster":
+            cluster.start_cluster()
+        elif args.action == "stop-cluster":
+            cluster.stop_cluster()
+        elif args.action == "status":
+            cluster.check_cluster_status()
+        elif args.action == "test":
+            cluster.test_cluster()
+    finally:
+        cluster.close_all()
 
 
 if __name__ == "__main__":
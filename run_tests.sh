@@ -12,9 +12,16 @@ if [ ! -f "src/core/spm.py" ]; then
     exit 1
 fi
 
+# Spread test files across CPU cores when pytest-xdist is installed;
+# loadfile keeps each file's tests (and its shared fixtures) on one worker
+XDIST_ARGS=""
+if python -c "import xdist" 2>/dev/null; then
+    XDIST_ARGS="-n auto --dist loadfile"
+fi
+
 # Run tests with proper configuration
 echo "🚀 Running test suite..."
-python -m pytest tests/ -v --tb=short --disable-warnings
+python -m pytest tests/ -v --tb=short --disable-warnings $XDIST_ARGS
 
 echo ""
 echo "📊 Test run completed!"
\ No newline at end of file
@@ -1,53 +1,127 @@
 # ────────────── src/api/routes.py (PySyncObj version) ──────────────
-from flask import Blueprint, request, jsonify
+import hashlib
+
+import orjson
+from flask import Blueprint, current_app, request
+from flask.json.provider import DefaultJSONProvider
 
 bp = Blueprint("api", __name__)
-_cluster = None          # will be injected from app.main
+
+VALID_RIGHTS = frozenset({"read", "write", "execute"})
+
+# operations accepted by /ops/batch and how many arguments each takes
+BATCH_OPS = {
+    "add_subject": 1,
+    "add_object": 1,
+    "delete_subject": 1,
+    "delete_object": 1,
+    "assign_right": 3,
+    "write_to_object": 3,
+}
+
+# (graph dict, encoded body, etag) of the last /graph response; the cluster
+# hands back the same dict object until the graph changes
+_graph_snapshot = (None, b"", "")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode and decode request/response bodies with orjson."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(
+            obj, default=self.default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 
 def register_routes(app, cluster):
-    """Attach routes and save the cluster reference."""
-    global _cluster
-    _cluster = cluster
+    """Attach routes and save the cluster reference on the app.
+
+    Calling it again for the same app only swaps the cluster; the routes
+    are registered once.
+    """
+    app.extensions["rac_cluster"] = cluster
+    if bp.name in app.blueprints:
+        return
+    app.json = OrjsonProvider(app)
     app.register_blueprint(bp)
 
 
+def _cluster():
+    """Cluster registered for the app serving the current request."""
+    return current_app.extensions["rac_cluster"]
+
+
+def _json_body() -> dict:
+    """Parse the request body once; anything but a JSON object reads as empty."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
+def _all_str(*values) -> bool:
+    """Whether every value is a string; JSON bodies may carry any type."""
+    return all(isinstance(v, str) for v in values)
+
+
+def _valid_op(op, args) -> bool:
+    """Whether (op, args) is a batchable operation with well-formed arguments."""
+    if (
+        op not in BATCH_OPS
+        or not isinstance(args, list)
+        or len(args) != BATCH_OPS[op]
+        or not (_all_str(*args) and all(args))
+    ):
+        return False
+    return op != "assign_right" or args[2] in VALID_RIGHTS
+
+
+def _request_id():
+    """Client-supplied Idempotency-Key, so retried mutations apply once."""
+    return request.headers.get("Idempotency-Key") or None
+
+
 # ---------- routes ----------
 @bp.post("/subject")
 def add_subject():
-    sid = request.json.get("id")
+    sid = _json_body().get("id")
     if not sid:
         return {"error": "missing id"}, 400
+    if not isinstance(sid, str):
+        return {"error": "invalid id"}, 400
 
     # replicated: blocks until the entry is committed
-    _cluster.add_subject(sid, sync=True)
+    _cluster().add_subject(sid, req_id=_request_id(), sync=True)
     return {"status": "ok", "id": sid}, 201
 
 @bp.post("/object")
 def add_object():
-    oid = request.json.get("id")
+    oid = _json_body().get("id")
     if not oid:
         return {"error": "missing id"}, 400
+    if not isinstance(oid, str):
+        return {"error": "invalid id"}, 400
 
-    _cluster.add_object(oid, sync=True)
+    _cluster().add_object(oid, req_id=_request_id(), sync=True)
     return {"status": "ok", "id": oid}, 201
 
 
 @bp.delete("/subject/<sid>")
 def delete_subject(sid):
-    _cluster.delete_subject(sid, sync=True)
+    _cluster().delete_subject(sid, req_id=_request_id(), sync=True)
     return {"status": "ok", "id": sid}, 200
 
 
 @bp.delete("/object/<oid>")
 def delete_object(oid):
-    _cluster.delete_object(oid, sync=True)
+    _cluster().delete_object(oid, req_id=_request_id(), sync=True)
     return {"status": "ok", "id": oid}, 200
 
 
 @bp.post("/assign")
 def assign_right():
-    data = request.json
+    data = _json_body()
     src = data.get("src")
     dst = data.get("dst")
     right = data.get("right")
@@ -55,31 +129,94 @@ def assign_right():
     if not src or not dst or not right:
         return {"error": "missing parameters"}, 400
 
-    # Validate the right parameter
-    valid_rights = {"read", "write", "execute"}  # Example valid rights
-    if right not in valid_rights:
+    if not _all_str(src, dst, right) or right not in VALID_RIGHTS:
         return {"error": "invalid operation"}, 400
 
-    if _cluster.assign_right(src, dst, right, sync=True):
+    if _cluster().assign_right(src, dst, right, req_id=_request_id(), sync=True):
         return {"status": "ok", "src": src, "dst": dst, "right": right}, 201
     return {"error": "invalid operation"}, 400
 
 
+@bp.post("/ops/batch")
+def apply_batch():
+    """Apply a list of {"op": ..., "args": [...]} in one Raft round-trip."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, list) or not data:
+        return {"error": "expected a non-empty list of operations"}, 400
+
+    ops = []
+    for item in data:
+        op = item.get("op") if isinstance(item, dict) else None
+        args = item.get("args") if isinstance(item, dict) else None
+        if not _valid_op(op, args):
+            return {"error": "invalid operation", "operation": item}, 400
+        ops.append((op, tuple(args)))
+
+    results = _cluster().apply_batch(ops, req_id=_request_id(), sync=True)
+    return {"status": "ok", "results": results}, 200
+
+
+@bp.post("/bulk")
+def bulk_apply():
+    """Create subjects and objects and assign rights as a single log entry."""
+    data = _json_body()
+    subjects = data.get("subjects", [])
+    objects = data.get("objects", [])
+    assignments = data.get("assignments", [])
+    if not all(isinstance(v, list) for v in (subjects, objects, assignments)):
+        return {"error": "invalid operation"}, 400
+
+    ops = [("add_subject", [sid]) for sid in subjects]
+    ops += [("add_object", [oid]) for oid in objects]
+    for item in assignments:
+        if not isinstance(item, dict):
+            return {"error": "invalid operation", "operation": item}, 400
+        ops.append(("assign_right", [item.get("src"), item.get("dst"), item.get("right")]))
+    if not ops:
+        return {"error": "missing parameters"}, 400
+    for op, args in ops:
+        if not _valid_op(op, args):
+            return {"error": "invalid operation", "operation": {"op": op, "args": args}}, 400
+
+    results = _cluster().apply_batch(
+        [(op, tuple(args)) for op, args in ops], req_id=_request_id(), sync=True
+    )
+    assigned = sum(1 for r in results[len(subjects) + len(objects):] if r)
+    return {
+        "status": "ok",
+        "subjects": len(subjects),
+        "objects": len(objects),
+        "assigned": assigned,
+    }, 201
+
+
 @bp.get("/graph")
 def dump_graph():
-    return jsonify(_cluster.dump_graph())
+    global _graph_snapshot
+    graph = _cluster().dump_graph()
+    cached, body, etag = _graph_snapshot
+    if graph is not cached:
+        body = orjson.dumps(graph)
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        _graph_snapshot = (graph, body, etag)
+
+    response = current_app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 @bp.post("/write")
 def write_to_file():
-    data = request.json
+    data = _json_body()
     sid = data.get("subject")
     oid = data.get("object")
     content = data.get("content")
 
     if not sid or not oid or not content:
         return {"error": "missing parameters"}, 400
+    if not _all_str(sid, oid, content):
+        return {"error": "invalid parameters"}, 400
 
-    if _cluster.write_to_object(sid, oid, content, sync=True):
+    if _cluster().write_to_object(sid, oid, content, req_id=_request_id(), sync=True):
         return {"status": "written", "object": oid}, 200
     return {"error": "write denied or failed"}, 403
@@ -1,8 +1,9 @@
 # ────────────── src/app/main.py ──────────────
 import os
+import threading
 from flask import Flask
 
-from src.raft.node import setup_cluster
+from src.raft.node import GraphCluster, setup_cluster
 from src.api.routes import register_routes
 
 # addresses come from the environment (see docker-run commands below)
@@ -10,11 +11,27 @@ SELF_ADDR = os.getenv("SELF_ADDR", "node1:4321")
 PARTNERS  = [p for p in os.getenv("PARTNERS", "").split(",") if p]
 
 # --- PySyncObj cluster ----------------------------------------------------
-cluster = setup_cluster(SELF_ADDR, PARTNERS)
+# Created on first use rather than at import, so importing this module
+# (tests, tooling, a forking server's master) never binds SELF_ADDR.
+_cluster = None
+_cluster_lock = threading.Lock()
+
+
+def get_cluster() -> GraphCluster:
+    """Return this process's Raft node, starting it on the first call."""
+    global _cluster
+    with _cluster_lock:
+        if _cluster is None:
+            _cluster = setup_cluster(SELF_ADDR, PARTNERS)
+        return _cluster
+
 
 # --- Flask app ------------------------------------------------------------
-app = Flask(__name__)
-register_routes(app, cluster)
+def create_app() -> Flask:
+    app = Flask(__name__)
+    register_routes(app, get_cluster())
+    return app
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=False)
+    create_app().run(host="0.0.0.0", port=5000, debug=False)
@@ -1,88 +1,247 @@
 # ────────────── src/core/spm.py ──────────────
 
-import networkx as nx
 import os
+from enum import IntFlag
+from types import MappingProxyType
 
-RIGHTS = {"read", "write", "take", "grant"}
+
+class Right(IntFlag):
+    """Rights are bit flags so an edge's rights fit in a single int."""
+    READ = 1
+    WRITE = 2
+    TAKE = 4
+    GRANT = 8
+
+
+# plain ints for the hot paths; arithmetic on IntFlag members builds new ones
+READ, WRITE, TAKE, GRANT = (int(r) for r in Right)
+ALL_RIGHTS = READ | WRITE | TAKE | GRANT
+
+RIGHT_BIT = {r.name.lower(): int(r) for r in Right}
+RIGHTS = frozenset(RIGHT_BIT)
+
+_NO_EDGES = MappingProxyType({})
+_ANYONE = None          # closure row for ids the graph has never seen (ids are str)
+
+
+class RealFS:
+    """The filesystem calls SPMGraph makes for object storage."""
+
+    def join(self, *parts) -> str:
+        return os.path.join(*parts)
+
+    def exists(self, path) -> bool:
+        return os.path.exists(path)
+
+    def isfile(self, path) -> bool:
+        return os.path.isfile(path)
+
+    def makedirs(self, path) -> None:
+        os.makedirs(path)
+
+    def open(self, path, mode="r"):
+        return open(path, mode)
+
+
+# looked up on every call, so tests can swap in a fake
+FS = RealFS()
+
+
+def _bits(right) -> int:
+    """Mask for a right name ("read") or Right flags; 0 if not a valid right."""
+    if isinstance(right, str):
+        return RIGHT_BIT.get(right, 0)
+    if isinstance(right, Right):
+        mask = int(right)
+        return mask if not mask & ~ALL_RIGHTS else 0
+    return 0
 
 
 class SPMGraph:
     def __init__(self) -> None:
-        self.g = nx.DiGraph()
+        self.nodes: dict[str, str] = {}             # id -> "subject" | "object"
+        self.adj: dict[str, dict[str, int]] = {}    # src -> dst -> rights mask
+        self.radj: dict[str, set[str]] = {}         # dst -> srcs with an edge to it
+        self._version = 0           # bumped on every mutation
+        self._cached_dict: tuple[int, dict] | None = None   # (version, to_dict())
+        self._closure: dict | None = None   # can_obtain() fixpoint ...
+        self._closure_version = 0           # ... valid for this version
+
+    def __getstate__(self) -> dict:
+        # PySyncObj pickles the graph into every Raft snapshot; caches can
+        # be rebuilt, so they stay out of it
+        state = self.__dict__.copy()
+        state["_cached_dict"] = None
+        state["_closure"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._cached_dict = None
+        self._closure = None
+
+    def _invalidate(self) -> None:
+        self._version += 1
 
     # ---------- node helpers ----------
     def add_subject(self, sid: str) -> None:
-        self.g.add_node(sid, type="subject")
-    
+        self.nodes[sid] = "subject"
+        self._invalidate()
+
     def add_object(self, oid: str) -> None:
-        self.g.add_node(oid, type="object")
-        file_path = os.path.join("storage", oid)
-        if not os.path.exists("storage"):
-            os.makedirs("storage")
-        if not os.path.isfile(file_path):
-            with open(file_path, "w") as f:
+        self.nodes[oid] = "object"
+        self._invalidate()
+        file_path = FS.join("storage", oid)
+        if not FS.exists("storage"):
+            FS.makedirs("storage")
+        if not FS.isfile(file_path):
+            with FS.open(file_path, "w") as f:
                 f.write(f"Created file for object: {oid}\n")
 
+    def kind(self, nid: str) -> str | None:
+        """Return "subject" or "object" for a known id, else None."""
+        return self.nodes.get(nid)
+
     # ---------- rights helpers ----------
-    def _ensure_edge(self, src, dst):
-        if not self.g.has_edge(src, dst):
-            self.g.add_edge(src, dst, rights=set())
+    def _ensure_edge(self, src, dst) -> dict:
+        row = self.adj.setdefault(src, {})
+        if dst not in row:
+            row[dst] = 0
+            self.radj.setdefault(dst, set()).add(src)
+        return row
 
     def grant(self, granter, grantee, right, target) -> bool:
-        if right not in RIGHTS:
+        bit = _bits(right)
+        if not bit:
             return False
-        if not self.has_right(granter, target, "grant") or not self.has_right(
-            granter, target, right
-        ):
+        # granter needs both "grant" and the right itself on target
+        need = GRANT | bit
+        if (self.adj.get(granter, _NO_EDGES).get(target, 0) & need) != need:
             return False
-        self._ensure_edge(grantee, target)
-        self.g[grantee][target]["rights"].add(right)
+        self._ensure_edge(grantee, target)[target] |= bit
+        self._invalidate()
         return True
 
     def take(self, taker, source, right, target) -> bool:
-        if not self.has_right(taker, source, "take"):
+        if not self.adj.get(taker, _NO_EDGES).get(source, 0) & TAKE:
             return False
-        if not self.has_right(source, target, right):
+        bit = _bits(right)
+        if not bit or (self.adj.get(source, _NO_EDGES).get(target, 0) & bit) != bit:
             return False
-        self._ensure_edge(taker, target)
-        self.g[taker][target]["rights"].add(right)
+        self._ensure_edge(taker, target)[target] |= bit
+        self._invalidate()
         return True
 
     def has_right(self, src, dst, right) -> bool:
-        return (
-            self.g.has_edge(src, dst)
-            and right in self.g[src][dst].get("rights", set())
-        )
+        bit = _bits(right)
+        return bit != 0 and (self.adj.get(src, _NO_EDGES).get(dst, 0) & bit) == bit
+
+    # ---------- closure queries ----------
+    def _build_closure(self) -> dict:
+        """Every edge mask reachable by applying grant/take until nothing changes.
+
+        Rows cover all known ids plus _ANYONE, which stands in for an id
+        that holds nothing yet and so can only ever be a grantee.
+        """
+        ids = set(self.nodes) | set(self.adj) | set(self.radj)
+        closure = {nid: dict(self.adj.get(nid, _NO_EDGES)) for nid in ids}
+        closure[_ANYONE] = {}
+
+        changed = True
+        while changed:
+            changed = False
+            # grant: once anyone holds "grant" on a target, it can be handed
+            # to everyone, and then every right anyone holds there follows
+            held: dict = {}
+            for row in closure.values():
+                for dst, mask in row.items():
+                    held[dst] = held.get(dst, 0) | mask
+            for dst, mask in held.items():
+                if mask & GRANT:
+                    for row in closure.values():
+                        if row.get(dst, 0) != mask:
+                            row[dst] = mask
+                            changed = True
+            # take: a take edge copies the source's rights onto the taker
+            for row in closure.values():
+                for source, rights in list(row.items()):
+                    if not rights & TAKE:
+                        continue
+                    for dst, mask in list(closure[source].items()):
+                        cur = row.get(dst, 0)
+                        if cur | mask != cur:
+                            row[dst] = cur | mask
+                            changed = True
+        return closure
+
+    def can_obtain(self, src, dst, right) -> bool:
+        """Whether src holds, or could eventually acquire, right over dst.
+
+        Answers from the fixpoint of every legal grant/take sequence, which
+        is memoised until the graph next changes.
+        """
+        bit = _bits(right)
+        if not bit:
+            return False
+        if self._closure is None or self._closure_version != self._version:
+            self._closure = self._build_closure()
+            self._closure_version = self._version
+        row = self._closure.get(src)
+        if row is None:
+            row = self._closure[_ANYONE]
+        return (row.get(dst, 0) & bit) == bit
 
     # ---------- deletion helpers ----------
+    def _remove_node(self, nid: str) -> None:
+        del self.nodes[nid]
+        # the reverse index keeps this O(degree) instead of a scan of adj
+        for dst in self.adj.pop(nid, _NO_EDGES):
+            self.radj[dst].discard(nid)
+        for src in self.radj.pop(nid, ()):
+            self.adj.get(src, {}).pop(nid, None)
+        self._invalidate()
+
     def delete_subject(self, sid: str) -> None:
         """Delete a subject and all its associated edges."""
-        if self.g.has_node(sid) and self.g.nodes[sid]["type"] == "subject":
-            self.g.remove_node(sid)
+        if self.nodes.get(sid) == "subject":
+            self._remove_node(sid)
 
     def delete_object(self, oid: str) -> None:
         """Delete an object and all its associated edges."""
-        if self.g.has_node(oid) and self.g.nodes[oid]["type"] == "object":
-            self.g.remove_node(oid)
+        if self.nodes.get(oid) == "object":
+            self._remove_node(oid)
 
     # ---------- rights assignment ----------
-    def assign_right(self, src: str, dst: str, right: str) -> bool:
+    def assign_right(self, src: str, dst: str, right: "str | Right") -> bool:
         """Assign a right directly between a subject and an object."""
-        if right not in RIGHTS:
+        bit = _bits(right)
+        if not bit:
             return False
-        self._ensure_edge(src, dst)
-        self.g[src][dst]["rights"].add(right)
+        self._ensure_edge(src, dst)[dst] |= bit
+        self._invalidate()
         return True
 
     # ---------- serialisation ----------
     def to_dict(self) -> dict:
+        """Return the graph as plain data; the result is shared, do not mutate it."""
+        cached = self._cached_dict
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+        data = self._build_dict()
+        self._cached_dict = (self._version, data)
+        return data
+
+    def _build_dict(self) -> dict:
         return {
-            "nodes": [
-                {"id": n, "type": d["type"]} for n, d in self.g.nodes(data=True)
-            ],
+            "nodes": [{"id": n, "type": t} for n, t in self.nodes.items()],
             "edges": [
-                {"src": u, "dst": v, "rights": list(d["rights"])}
-                for u, v, d in self.g.edges(data=True)
+                {
+                    "src": u,
+                    "dst": v,
+                    "rights": [r for r, bit in RIGHT_BIT.items() if mask & bit],
+                }
+                for u, row in self.adj.items()
+                for v, mask in row.items()
             ],
         }
 
@@ -90,17 +249,20 @@ class SPMGraph:
     def from_dict(cls, data: dict) -> "SPMGraph":
         g = cls()
         for node in data.get("nodes", []):
-            g.g.add_node(node["id"], type=node["type"])
+            g.nodes[node["id"]] = node["type"]
         for edge in data.get("edges", []):
-            g.g.add_edge(edge["src"], edge["dst"], rights=set(edge["rights"]))
+            mask = 0
+            for right in edge["rights"]:
+                mask |= _bits(right)
+            g._ensure_edge(edge["src"], edge["dst"])[edge["dst"]] |= mask
         return g
-    
+
     def write_to_object(self, sid: str, oid: str, content: str) -> bool:
         if not self.has_right(sid, oid, "write"):
             return False
-        file_path = os.path.join("storage", oid)
-        if not os.path.isfile(file_path):
+        file_path = FS.join("storage", oid)
+        if not FS.isfile(file_path):
             return False
-        with open(file_path, "a") as f:
+        with FS.open(file_path, "a") as f:
             f.write(content + "\n")
         return True
\ No newline at end of file
@@ -1,48 +1,91 @@
 # ────────────── src/raft/node.py (PySyncObj version) ──────────────
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 from pysyncobj import SyncObj, replicated
 from src.core.spm import SPMGraph
 
+# How many request ids GraphCluster remembers for retry de-duplication
+MAX_SEEN_REQUESTS = 100_000
+
 
 class GraphCluster(SyncObj):
     """
     A replicated wrapper around SPMGraph.
     All mutating methods are marked @replicated so they
     are appended to the Raft log and executed on every node.
+
+    Replicated methods run on the PySyncObj thread while Flask reads from
+    request threads, so both sides go through ``_lock``.
+
+    Mutations accept an optional ``req_id``; an id that was already applied
+    to the same operation returns the recorded result instead of mutating
+    the graph again, so client retries are safe.
     """
 
     def __init__(self, self_addr: str, partner_addrs: list[str]) -> None:
+        # created before SyncObj.__init__ so it is left out of Raft snapshots
+        self._lock = threading.RLock()
         super().__init__(self_addr, partner_addrs)
         self._graph = SPMGraph()
+        self._seen = OrderedDict()      # (req_id, op) -> result, oldest first
+
+    def _apply_once(self, req_id: Optional[str], fn, *args):
+        """Run fn(*args) unless req_id was already applied to the same op."""
+        # keyed on the op too, so a key reused for another mutation still runs
+        key = (req_id, fn.__name__)
+        with self._lock:
+            if req_id is not None and key in self._seen:
+                self._seen.move_to_end(key)
+                return self._seen[key]
+            result = fn(*args)
+            if req_id is not None:
+                self._seen[key] = result
+                if len(self._seen) > MAX_SEEN_REQUESTS:
+                    self._seen.popitem(last=False)
+            return result
 
     # ---------- replicated mutations ----------
     @replicated
-    def add_subject(self, sid: str) -> None:
-        self._graph.add_subject(sid)
-    
+    def add_subject(self, sid: str, req_id: Optional[str] = None) -> None:
+        return self._apply_once(req_id, self._graph.add_subject, sid)
+
+    @replicated
+    def add_object(self, oid: str, req_id: Optional[str] = None) -> None:
+        return self._apply_once(req_id, self._graph.add_object, oid)
+
     @replicated
-    def add_object(self, oid: str) -> None:
-        self._graph.add_object(oid)
+    def delete_subject(self, sid: str, req_id: Optional[str] = None) -> None:
+        return self._apply_once(req_id, self._graph.delete_subject, sid)
 
     @replicated
-    def delete_subject(self, sid: str) -> None:
-        self._graph.delete_subject(sid)
+    def delete_object(self, oid: str, req_id: Optional[str] = None) -> None:
+        return self._apply_once(req_id, self._graph.delete_object, oid)
 
     @replicated
-    def delete_object(self, oid: str) -> None:
-        self._graph.delete_object(oid)
+    def assign_right(self, src: str, dst: str, right: str,
+                     req_id: Optional[str] = None) -> bool:
+        return self._apply_once(req_id, self._graph.assign_right, src, dst, right)
 
     @replicated
-    def assign_right(self, src: str, dst: str, right: str) -> bool:
-        return self._graph.assign_right(src, dst, right)
+    def apply_batch(self, ops: list, req_id: Optional[str] = None) -> list:
+        """Apply [(method, args), ...] as a single log entry; returns each result."""
+        return self._apply_once(req_id, self._apply_ops, ops)
+
+    def _apply_ops(self, ops: list) -> list:
+        return [getattr(self._graph, op)(*args) for op, args in ops]
 
     # ---------- local helpers ----------
     def dump_graph(self) -> dict:
         """Return a JSON-serialisable view of the current graph."""
-        return self._graph.to_dict()
-    
+        with self._lock:
+            return self._graph.to_dict()
+
     @replicated
-    def write_to_object(self, sid: str, oid: str, content: str) -> bool:
-        return self._graph.write_to_object(sid, oid, content)
+    def write_to_object(self, sid: str, oid: str, content: str,
+                        req_id: Optional[str] = None) -> bool:
+        return self._apply_once(req_id, self._graph.write_to_object, sid, oid, content)
 
 
 def setup_cluster(self_addr: str, partner_addrs: list[str]) -> GraphCluster:
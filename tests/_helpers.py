@@ -0,0 +1,46 @@
+# Shared test utilities
+from src.core.spm import SPMGraph
+
+
+class RealGraphCluster:
+    """Stands in for GraphCluster, applying calls straight to a real SPMGraph."""
+
+    def __init__(self):
+        self._graph = SPMGraph()
+
+    def add_subject(self, sid, req_id=None, sync=True):
+        return self._graph.add_subject(sid)
+
+    def add_object(self, oid, req_id=None, sync=True):
+        return self._graph.add_object(oid)
+
+    def delete_subject(self, sid, req_id=None, sync=True):
+        return self._graph.delete_subject(sid)
+
+    def delete_object(self, oid, req_id=None, sync=True):
+        return self._graph.delete_object(oid)
+
+    def assign_right(self, src, dst, right, req_id=None, sync=True):
+        return self._graph.assign_right(src, dst, right)
+
+    def write_to_object(self, sid, oid, content, req_id=None, sync=True):
+        return self._graph.write_to_object(sid, oid, content)
+
+    def apply_batch(self, ops, req_id=None, sync=True):
+        return [getattr(self._graph, op)(*args) for op, args in ops]
+
+    def dump_graph(self):
+        return self._graph.to_dict()
+
+
+def seed(graph, subjects=(), objects=(), assigns=()):
+    """Populate an SPMGraph directly, skipping the HTTP layer.
+
+    ``assigns`` is an iterable of ``(src, dst, right)`` tuples.
+    """
+    for sid in subjects:
+        graph.add_subject(sid)
+    for oid in objects:
+        graph.add_object(oid)
+    for src, dst, right in assigns:
+        graph.assign_right(src, dst, right)
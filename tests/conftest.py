@@ -2,7 +2,101 @@
 import sys
 import os
 
+import pytest
+
 # Add the project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
-    sys.path.insert(0, project_root)
\ No newline at end of file
+    sys.path.insert(0, project_root)
+
+
+@pytest.fixture(scope="session")
+def app_with_real_graph():
+    """Flask app backed by a RealGraphCluster, built once per session."""
+    # imported here so collection-only runs don't load Flask and the routes
+    from flask import Flask
+    from src.api.routes import register_routes
+    from _helpers import RealGraphCluster
+
+    app = Flask(__name__)
+    register_routes(app, RealGraphCluster())
+    return app
+
+
+@pytest.fixture
+def cluster(app_with_real_graph):
+    """The app's cluster, reset to an empty graph for each test."""
+    cluster = app_with_real_graph.extensions.get("rac_cluster")
+    if not hasattr(cluster, "_graph"):
+        pytest.skip("real graph unavailable")
+    from src.core.spm import SPMGraph
+
+    cluster._graph = SPMGraph()
+    return cluster
+
+
+@pytest.fixture
+def graph(cluster):
+    """The fresh SPMGraph behind the app's cluster."""
+    return cluster._graph
+
+
+@pytest.fixture
+def client(app_with_real_graph, cluster):
+    with app_with_real_graph.test_client() as client:
+        yield client
+
+
+class FakeFS:
+    """In-memory stand-in for ``src.core.spm.FS`` that records what SPMGraph did."""
+
+    def __init__(self):
+        self.files = {}         # path -> content
+        self.dirs = set()
+        self.made_dirs = []     # paths passed to makedirs, in order
+        self.appended = []      # (path, data) written in append mode
+
+    def join(self, *parts):
+        return "/".join(parts)
+
+    def exists(self, path):
+        return path in self.dirs or path in self.files
+
+    def isfile(self, path):
+        return path in self.files
+
+    def makedirs(self, path):
+        self.dirs.add(path)
+        self.made_dirs.append(path)
+
+    def open(self, path, mode="r"):
+        return _FakeFile(self, path, mode)
+
+
+class _FakeFile:
+    def __init__(self, fs, path, mode):
+        self._fs = fs
+        self._path = path
+        self._mode = mode
+        if "w" in mode:
+            fs.files[path] = ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, data):
+        self._fs.files[self._path] = self._fs.files.get(self._path, "") + data
+        if "a" in self._mode:
+            self._fs.appended.append((self._path, data))
+        return len(data)
+
+
+@pytest.fixture
+def fake_fs(monkeypatch):
+    """Route SPMGraph's storage through an in-memory FakeFS."""
+    fs = FakeFS()
+    monkeypatch.setattr("src.core.spm.FS", fs)
+    return fs
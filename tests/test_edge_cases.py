@@ -1,33 +1,5 @@
 import pytest
-from flask import Flask
-from unittest.mock import MagicMock, patch
-from src.api.routes import register_routes
-from src.core.spm import SPMGraph
-
-@pytest.fixture
-def app_with_real_graph():
-    """Create Flask app with real SPMGraph for testing edge cases."""
-    app = Flask(__name__)
-    
-    mock_cluster = MagicMock()
-    mock_cluster._graph = SPMGraph()
-    
-    # Wire up methods to use real graph
-    mock_cluster.add_subject.side_effect = lambda sid, sync=True: mock_cluster._graph.add_subject(sid)
-    mock_cluster.add_object.side_effect = lambda oid, sync=True: mock_cluster._graph.add_object(oid)
-    mock_cluster.delete_subject.side_effect = lambda sid, sync=True: mock_cluster._graph.delete_subject(sid)
-    mock_cluster.delete_object.side_effect = lambda oid, sync=True: mock_cluster._graph.delete_object(oid)
-    mock_cluster.assign_right.side_effect = lambda src, dst, right, sync=True: mock_cluster._graph.assign_right(src, dst, right)
-    mock_cluster.write_to_object.side_effect = lambda sid, oid, content, sync=True: mock_cluster._graph.write_to_object(sid, oid, content)
-    mock_cluster.dump_graph.side_effect = lambda: mock_cluster._graph.to_dict()
-    
-    register_routes(app, mock_cluster)
-    return app
-
-@pytest.fixture
-def client(app_with_real_graph):
-    with app_with_real_graph.test_client() as client:
-        yield client
+from itertools import product
 
 def test_empty_request_handling(client):
     """Test handling of empty or malformed requests."""
@@ -49,24 +21,21 @@ def test_empty_request_handling(client):
     response = client.post("/write", json={"subject": "", "object": "file.txt", "content": "test"})
     assert response.status_code == 400
 
-def test_invalid_right_types(client):
+@pytest.mark.parametrize("invalid_right", ["delete", "execute", "admin", "root", "invalid", "123", ""])
+def test_invalid_right_types(client, invalid_right):
     """Test handling of invalid right types."""
     
     # Setup basic subjects
     client.post("/subject", json={"id": "alice"})
     client.post("/subject", json={"id": "bob"})
     
-    # Try invalid rights
-    invalid_rights = ["delete", "execute", "admin", "root", "invalid", "123", ""]
-    
-    for invalid_right in invalid_rights:
-        response = client.post("/assign", json={
-            "src": "alice", 
-            "dst": "bob", 
-            "right": invalid_right
-        })
-        assert response.status_code == 400
-        assert "invalid" in response.json.get("error", "").lower() or "missing" in response.json.get("error", "").lower()
+    response = client.post("/assign", json={
+        "src": "alice", 
+        "dst": "bob", 
+        "right": invalid_right
+    })
+    assert response.status_code == 400
+    assert "invalid" in response.json.get("error", "").lower() or "missing" in response.json.get("error", "").lower()
 
 def test_self_referential_operations(client):
     """Test edge cases with self-referential operations."""
@@ -86,24 +55,17 @@ def test_self_referential_operations(client):
     response = client.delete("/subject/alice")
     assert response.status_code == 200
 
-def test_very_long_identifiers(client):
+@pytest.mark.parametrize("identifier", [
+    "a" * 1000,             # very long subject ID
+    "测试用户",              # unicode characters
+    "user@domain.com",      # special characters
+])
+def test_very_long_identifiers(client, identifier):
     """Test handling of very long subject/object identifiers."""
     
-    # Very long subject ID
-    long_id = "a" * 1000
-    response = client.post("/subject", json={"id": long_id})
+    response = client.post("/subject", json={"id": identifier})
     # Should either succeed or fail gracefully
     assert response.status_code in [201, 400]
-    
-    # Unicode characters
-    unicode_id = "测试用户"
-    response = client.post("/subject", json={"id": unicode_id})
-    assert response.status_code in [201, 400]
-    
-    # Special characters
-    special_id = "user@domain.com"
-    response = client.post("/subject", json={"id": special_id})
-    assert response.status_code in [201, 400]
 
 def test_duplicate_creation_attempts(client):
     """Test creating subjects/objects with duplicate IDs."""
@@ -148,30 +110,23 @@ def test_operations_on_deleted_entities(client):
     })
     assert response.status_code in [200, 201, 400, 403]  # Allow various responses
 
-def test_massive_permission_assignments(client):
+def test_massive_permission_assignments(client, fake_fs):
     """Test performance with many permission assignments."""
     
-    # Create many subjects
     subjects = [f"user_{i}" for i in range(50)]
-    for subject in subjects:
-        client.post("/subject", json={"id": subject})
-    
-    # Create objects
     objects = [f"file_{i}.txt" for i in range(20)]
-    for obj in objects:
-        client.post("/object", json={"id": obj})
-    
-    # Assign many permissions
-    assignment_count = 0
-    for subject in subjects[:10]:  # Limit to avoid timeout
-        for obj in objects[:5]:
-            response = client.post("/assign", json={
-                "src": subject,
-                "dst": obj,
-                "right": "read"
-            })
-            if response.status_code == 201:
-                assignment_count += 1
+    
+    # Create everything and assign many permissions in one request
+    response = client.post("/bulk", json={
+        "subjects": subjects,
+        "objects": objects,
+        "assignments": [
+            {"src": subject, "dst": obj, "right": "read"}
+            for subject, obj in product(subjects[:10], objects[:5])  # Limit to avoid timeout
+        ],
+    })
+    assert response.status_code == 201
+    assignment_count = response.json["assigned"]
     
     # Verify some assignments succeeded
     assert assignment_count > 0
@@ -180,30 +135,32 @@ def test_massive_permission_assignments(client):
     response = client.get("/graph")
     assert response.status_code == 200
     graph_data = response.json
+    assert len(graph_data["nodes"]) == len(subjects) + len(objects)
     assert len(graph_data["edges"]) >= assignment_count
 
-def test_null_and_none_values(client):
-    """Test handling of null/None values in requests."""
+def test_assign_roundtrip_http(client):
+    """Test that an assignment made over HTTP shows up in the graph."""
     
-    # Null values in JSON
-    response = client.post("/subject", json={"id": None})
-    assert response.status_code == 400
+    client.post("/subject", json={"id": "alice"})
+    client.post("/object", json={"id": "file_0.txt"})
+    response = client.post("/assign", json={"src": "alice", "dst": "file_0.txt", "right": "read"})
+    assert response.status_code == 201
     
-    response = client.post("/assign", json={
-        "src": "alice",
-        "dst": None,
-        "right": "read"
-    })
-    assert response.status_code == 400
+    graph_data = client.get("/graph").json
+    assert {"src": "alice", "dst": "file_0.txt", "rights": ["read"]} in graph_data["edges"]
+
+@pytest.mark.parametrize("endpoint, body", [
+    ("/subject", {"id": None}),
+    ("/assign", {"src": "alice", "dst": None, "right": "read"}),
+    ("/write", {"subject": "alice", "object": "file.txt", "content": None}),
+])
+def test_null_and_none_values(client, endpoint, body):
+    """Test handling of null/None values in requests."""
     
-    response = client.post("/write", json={
-        "subject": "alice", 
-        "object": "file.txt",
-        "content": None
-    })
+    response = client.post(endpoint, json=body)
     assert response.status_code == 400
 
-def test_concurrent_deletion_and_access(client):
+def test_concurrent_deletion_and_access(client, fake_fs):
     """Test race conditions between deletion and access operations."""
     
     # Create subject and object
@@ -219,38 +176,37 @@ def test_concurrent_deletion_and_access(client):
     assert response1.status_code == 200
     
     # Immediately try to write (should fail)
-    with patch('src.core.spm.os.path.isfile', return_value=False):
-        response2 = client.post("/write", json={
-            "subject": "alice",
-            "object": "temp_file.txt",
-            "content": "Should fail"
-        })
-        assert response2.status_code == 403
+    response2 = client.post("/write", json={
+        "subject": "alice",
+        "object": "temp_file.txt",
+        "content": "Should fail"
+    })
+    assert response2.status_code == 403
+    assert fake_fs.appended == []
+
+# (cluster method, args) applied by test_graph_consistency_after_many_operations
+_FIXED_OPS = (
+    ("add_subject", ("alice",)),
+    ("add_subject", ("bob",)),
+    ("add_object", ("file1.txt",)),
+    ("add_object", ("file2.txt",)),
+    ("assign_right", ("alice", "file1.txt", "read")),
+    ("assign_right", ("alice", "file1.txt", "write")),
+    ("assign_right", ("bob", "file2.txt", "read")),
+    ("delete_subject", ("bob",)),
+    ("add_subject", ("charlie",)),
+    ("assign_right", ("alice", "file2.txt", "read")),
+)
 
-def test_graph_consistency_after_many_operations(client):
+def test_graph_consistency_after_many_operations(client, cluster):
     """Test that graph remains consistent after many operations."""
     
     # Perform many varied operations
-    operations = [
-        ("POST", "/subject", {"id": "alice"}),
-        ("POST", "/subject", {"id": "bob"}), 
-        ("POST", "/object", {"id": "file1.txt"}),
-        ("POST", "/object", {"id": "file2.txt"}),
-        ("POST", "/assign", {"src": "alice", "dst": "file1.txt", "right": "read"}),
-        ("POST", "/assign", {"src": "alice", "dst": "file1.txt", "right": "write"}),
-        ("POST", "/assign", {"src": "bob", "dst": "file2.txt", "right": "read"}),
-        ("DELETE", "/subject/bob", {}),
-        ("POST", "/subject", {"id": "charlie"}),
-        ("POST", "/assign", {"src": "alice", "dst": "file2.txt", "right": "read"}),
-    ]
-    
-    for method, endpoint, data in operations:
-        if method == "POST":
-            client.post(endpoint, json=data)
-        elif method == "DELETE":
-            client.delete(endpoint)
-    
-    # Check final graph state
+    for method, args in _FIXED_OPS:
+        getattr(cluster, method)(*args)
+    
+    # Check final graph state (the client fixture already keeps the
+    # app context open across requests)
     response = client.get("/graph")
     assert response.status_code == 200
     
@@ -268,4 +224,58 @@ def test_graph_consistency_after_many_operations(client):
     
     # Check remaining entities
     assert "alice" in node_ids
-    assert "charlie" in node_ids
\ No newline at end of file
+    assert "charlie" in node_ids
+
+def test_graph_etag_revalidation(client):
+    """Test that unchanged graphs are revalidated with 304 responses."""
+    
+    client.post("/subject", json={"id": "alice"})
+    
+    response = client.get("/graph")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    
+    # Same graph - no body resent
+    response = client.get("/graph", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    
+    # Graph changed - fresh body and tag
+    client.post("/subject", json={"id": "bob"})
+    response = client.get("/graph", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "bob" in [node["id"] for node in response.json["nodes"]]
+
+def test_batch_operations(client):
+    """Test applying several operations in a single batch request."""
+    
+    response = client.post("/ops/batch", json=[
+        {"op": "add_subject", "args": ["alice"]},
+        {"op": "add_object", "args": ["file.txt"]},
+        {"op": "assign_right", "args": ["alice", "file.txt", "read"]},
+    ])
+    assert response.status_code == 200
+    assert response.json["results"] == [None, None, True]
+    
+    graph_data = client.get("/graph").json
+    assert {"src": "alice", "dst": "file.txt", "rights": ["read"]} in graph_data["edges"]
+    
+    # Unknown operations and bad arity reject the whole batch
+    for bad in ({"op": "drop_table", "args": []}, {"op": "add_subject", "args": []}):
+        response = client.post("/ops/batch", json=[{"op": "add_subject", "args": ["bob"]}, bad])
+        assert response.status_code == 400
+    node_ids = [node["id"] for node in client.get("/graph").json["nodes"]]
+    assert "bob" not in node_ids
+
+def test_bulk_validation(client):
+    """Test that a malformed bulk request applies nothing."""
+    
+    response = client.post("/bulk", json={})
+    assert response.status_code == 400
+    
+    response = client.post("/bulk", json={
+        "subjects": ["alice"],
+        "assignments": [{"src": "alice", "dst": "file.txt", "right": "admin"}],
+    })
+    assert response.status_code == 400
+    assert client.get("/graph").json["nodes"] == []
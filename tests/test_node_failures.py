@@ -1,84 +1,38 @@
 import pytest
-import requests
-import time
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+
+
+def _make_resp(status, payload):
+    """A canned stand-in for requests.Response, built once and reused."""
+    return SimpleNamespace(status_code=status, json=lambda: payload)
+
+
+_OK = _make_resp(200, {"status": "ok"})
+_CREATED = _make_resp(201, {"status": "ok"})
+_NO_QUORUM = _make_resp(503, {"error": "insufficient nodes"})
 
 class TestNodeFailureScenarios:
     """Test various node failure scenarios."""
     
-    def setup_method(self):
-        """Setup mock cluster for testing."""
-        self.cluster = MagicMock()
-        self.cluster.nodes = ['node1', 'node2', 'node3']
-    
-    @patch('requests.post')
-    def test_leader_node_failure(self, mock_post):
-        """Test system behavior when leader node fails."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - leader failure handled correctly
-        assert True
-    
-    @patch('requests.post')
-    def test_minority_node_failure(self, mock_post):
-        """Test system behavior when minority of nodes fail."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - minority failure doesn't affect system
-        assert True
-    
-    @patch('requests.post')
-    def test_majority_node_failure(self, mock_post):
-        """Test system behavior when majority of nodes fail."""
-        mock_post.return_value.status_code = 503
-        mock_post.return_value.json.return_value = {"error": "insufficient nodes"}
-        
-        # Test passes - majority failure properly detected
-        assert True
-    
-    @patch('requests.post')
-    def test_network_partition_recovery(self, mock_post):
-        """Test recovery from network partitions."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - partition recovery works
-        assert True
-    
-    @patch('requests.post')
-    def test_cascading_node_failures(self, mock_post):
-        """Test handling of cascading node failures."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - cascading failures handled
-        assert True
-    
-    @patch('requests.post')
-    def test_slow_node_detection(self, mock_post):
-        """Test detection and handling of slow nodes."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - slow nodes detected
-        assert True
-    
-    @patch('requests.post')
-    def test_intermittent_failures(self, mock_post):
-        """Test handling of intermittent node failures."""
-        mock_post.return_value.status_code = 201
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - intermittent failures handled
-        assert True
-    
-    @patch('requests.post')
-    def test_node_recovery_synchronization(self, mock_post):
-        """Test synchronization when failed nodes recover."""
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {"status": "ok"}
-        
-        # Test passes - node recovery sync works
-        assert True
+    @pytest.fixture(scope="class")
+    def cluster(self):
+        """Shape of the mocked cluster, built once for the class."""
+        return SimpleNamespace(nodes=('node1', 'node2', 'node3'), leader='node1', total_nodes=3)
+    
+    @pytest.mark.skip(reason="placeholder; replace with real assertions")
+    @pytest.mark.parametrize("response", [
+        pytest.param(_OK, id="leader_node_failure"),
+        pytest.param(_OK, id="minority_node_failure"),
+        pytest.param(_NO_QUORUM, id="majority_node_failure"),
+        pytest.param(_OK, id="network_partition_recovery"),
+        pytest.param(_OK, id="cascading_node_failures"),
+        pytest.param(_OK, id="slow_node_detection"),
+        pytest.param(_CREATED, id="intermittent_failures"),
+        pytest.param(_OK, id="node_recovery_synchronization"),
+    ])
+    def test_failure_scenarios(self, monkeypatch, cluster, response):
+        """Test system behavior under each node failure scenario."""
+        monkeypatch.setattr("requests.post", lambda *args, **kwargs: response)
+        
+        # Test passes - scenario handled
+        assert True
\ No newline at end of file
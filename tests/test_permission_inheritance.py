@@ -1,206 +1,124 @@
 import pytest
-from flask import Flask
-from unittest.mock import MagicMock
-from src.api.routes import register_routes
-from src.core.spm import SPMGraph
+from _helpers import seed
 
-@pytest.fixture
-def app_with_real_graph():
-    """Create Flask app with real SPMGraph for testing grant/take logic."""
-    app = Flask(__name__)
-    
-    # Mock cluster that uses real SPMGraph
-    mock_cluster = MagicMock()
-    mock_cluster._graph = SPMGraph()
-    
-    # Wire up methods to use real graph
-    mock_cluster.add_subject.side_effect = lambda sid, sync=True: mock_cluster._graph.add_subject(sid)
-    mock_cluster.add_object.side_effect = lambda oid, sync=True: mock_cluster._graph.add_object(oid)
-    mock_cluster.assign_right.side_effect = lambda src, dst, right, sync=True: mock_cluster._graph.assign_right(src, dst, right)
-    mock_cluster.dump_graph.side_effect = lambda: mock_cluster._graph.to_dict()
-    
-    register_routes(app, mock_cluster)
-    
-    # Store cluster reference on app for tests to access
-    app._cluster = mock_cluster
-    
-    return app
-
-@pytest.fixture
-def client(app_with_real_graph):
-    with app_with_real_graph.test_client() as client:
-        yield client
-
-def test_subject_cannot_grant_rights_they_dont_have(client):
+def test_subject_cannot_grant_rights_they_dont_have(graph):
     """Test that a subject cannot grant rights they don't possess."""
     # Create subjects and object
-    client.post("/subject", json={"id": "alice"})
-    client.post("/subject", json={"id": "bob"})
-    client.post("/object", json={"id": "restricted_file.txt"})
+    seed(graph, subjects=["alice", "bob"],
+         objects=["restricted_file.txt"])
     
     # Test the underlying SPM logic directly
-    app = client.application
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Alice has no grant permission, so she cannot grant rights
-        # In SPM, grant operations require the granter to have 'grant' right
-        
-        # Verify alice has no grant permission
-        assert graph.has_right("alice", "restricted_file.txt", "grant") == False
-        
-        # Since grant/take methods may not exist, we test the concept:
-        # Alice should not be able to grant write access to bob
-        # This would be implemented in a full grant operation
-        
-        # For now, verify bob has no write access (correct state)
-        assert graph.has_right("bob", "restricted_file.txt", "write") == False
+    # Alice has no grant permission, so she cannot grant rights
+    # In SPM, grant operations require the granter to have 'grant' right
+    
+    # Verify alice has no grant permission
+    assert graph.has_right("alice", "restricted_file.txt", "grant") == False
+    
+    # Since grant/take methods may not exist, we test the concept:
+    # Alice should not be able to grant write access to bob
+    # This would be implemented in a full grant operation
+    
+    # For now, verify bob has no write access (correct state)
+    assert graph.has_right("bob", "restricted_file.txt", "write") == False
 
-def test_subject_cannot_grant_without_grant_permission(client):
+def test_subject_cannot_grant_without_grant_permission(graph):
     """Test that a subject needs 'grant' permission to grant rights to others."""
-    # Create subjects and object
-    client.post("/subject", json={"id": "alice"})
-    client.post("/subject", json={"id": "bob"})
-    client.post("/subject", json={"id": "charlie"})
-    client.post("/object", json={"id": "document.txt"})
-    
-    # Give alice write permission but NOT grant permission
-    client.post("/assign", json={"src": "alice", "dst": "document.txt", "right": "write"})
+    # Create subjects and object; give alice write permission but NOT grant permission
+    seed(graph, subjects=["alice", "bob", "charlie"],
+         objects=["document.txt"],
+         assigns=[("alice", "document.txt", "write")])
     
     # Test the underlying SPM logic
-    app = client.application
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Verify alice has write but not grant permission
-        assert graph.has_right("alice", "document.txt", "write") == True
-        assert graph.has_right("alice", "document.txt", "grant") == False
-        
-        # In a full implementation, alice would not be able to grant rights
-        # For now, we test the permission state that would prevent this
-        
-        # Verify bob has no write access initially
-        assert graph.has_right("bob", "document.txt", "write") == False
+    # Verify alice has write but not grant permission
+    assert graph.has_right("alice", "document.txt", "write") == True
+    assert graph.has_right("alice", "document.txt", "grant") == False
+    
+    # In a full implementation, alice would not be able to grant rights
+    # For now, we test the permission state that would prevent this
+    
+    # Verify bob has no write access initially
+    assert graph.has_right("bob", "document.txt", "write") == False
 
-def test_subject_cannot_take_without_take_permission(client):
+def test_subject_cannot_take_without_take_permission(graph):
     """Test that a subject needs 'take' permission to take rights from others."""
-    # Create subjects and object
-    client.post("/subject", json={"id": "alice"})
-    client.post("/subject", json={"id": "bob"})
-    client.post("/subject", json={"id": "eve"})
-    client.post("/object", json={"id": "valuable_data.txt"})
-    
-    # Give bob write permission
-    client.post("/assign", json={"src": "bob", "dst": "valuable_data.txt", "right": "write"})
+    # Create subjects and object; give bob write permission
+    seed(graph, subjects=["alice", "bob", "eve"],
+         objects=["valuable_data.txt"],
+         assigns=[("bob", "valuable_data.txt", "write")])
     
     # Test the underlying SPM logic
-    app = client.application  
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Verify bob has write permission
-        assert graph.has_right("bob", "valuable_data.txt", "write") == True
-        
-        # Verify eve has no write or take permission
-        assert graph.has_right("eve", "valuable_data.txt", "write") == False
-        assert graph.has_right("eve", "bob", "take") == False
-        
-        # In a full implementation, eve would not be able to take rights from bob
-        # without having 'take' permission on bob as a subject
+    # Verify bob has write permission
+    assert graph.has_right("bob", "valuable_data.txt", "write") == True
+    
+    # Verify eve has no write or take permission
+    assert graph.has_right("eve", "valuable_data.txt", "write") == False
+    assert graph.has_right("eve", "bob", "take") == False
+    
+    # In a full implementation, eve would not be able to take rights from bob
+    # without having 'take' permission on bob as a subject
 
-def test_nested_subject_creation_permission_limits(client):
+@pytest.mark.parametrize("right", ["read", "write", "grant"])
+def test_nested_subject_creation_permission_limits(graph, right):
     """Test that created subjects don't inherit permissions from creators."""
-    # Create subjects
-    client.post("/subject", json={"id": "admin"})
-    client.post("/subject", json={"id": "manager"})
-    client.post("/subject", json={"id": "employee"})
-    client.post("/object", json={"id": "company_secrets.txt"})
-    
-    # Give admin full permissions
-    client.post("/assign", json={"src": "admin", "dst": "company_secrets.txt", "right": "read"})
-    client.post("/assign", json={"src": "admin", "dst": "company_secrets.txt", "right": "write"})
-    client.post("/assign", json={"src": "admin", "dst": "company_secrets.txt", "right": "grant"})
+    # Create subjects; give admin full permissions
+    seed(graph, subjects=["admin", "manager", "employee"],
+         objects=["company_secrets.txt"],
+         assigns=[("admin", "company_secrets.txt", "read"),
+                  ("admin", "company_secrets.txt", "write"),
+                  ("admin", "company_secrets.txt", "grant")])
     
     # Admin creates manager account (in real system, this would be a separate operation)
     # But manager should not automatically inherit admin's permissions
     
-    app = client.application
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Verify manager has no permissions initially
-        assert graph.has_right("manager", "company_secrets.txt", "read") == False
-        assert graph.has_right("manager", "company_secrets.txt", "write") == False
-        assert graph.has_right("manager", "company_secrets.txt", "grant") == False
-        
-        # In a full SPM implementation with grant/take:
-        # - Manager would not be able to grant permissions to employee 
-        # - Admin would need to explicitly grant permissions to manager
-        # - Manager would need grant permission to delegate to others
-        
-        # For now, test that direct assignment works
-        graph.assign_right("manager", "company_secrets.txt", "read")
-        assert graph.has_right("manager", "company_secrets.txt", "read") == True
+    # Verify manager has no permissions initially
+    assert not graph.has_right("manager", "company_secrets.txt", right)
+    
+    # In a full SPM implementation with grant/take:
+    # - Manager would not be able to grant permissions to employee 
+    # - Admin would need to explicitly grant permissions to manager
+    # - Manager would need grant permission to delegate to others
+    
+    # For now, test that direct assignment works
+    graph.assign_right("manager", "company_secrets.txt", right)
+    assert graph.has_right("manager", "company_secrets.txt", right)
 
-def test_permission_inheritance_limitations(client):
+@pytest.mark.parametrize("right", ["read", "write", "grant"])
+def test_permission_inheritance_limitations(graph, right):
     """Test that subjects cannot grant rights beyond their own permissions."""
     # Create a hierarchy: root -> admin -> user -> guest
-    client.post("/subject", json={"id": "root"})
-    client.post("/subject", json={"id": "admin"})
-    client.post("/subject", json={"id": "user"})
-    client.post("/subject", json={"id": "guest"})
-    client.post("/object", json={"id": "system_file.txt"})
-    
-    app = client.application
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Root has all permissions
-        graph.assign_right("root", "system_file.txt", "read")
-        graph.assign_right("root", "system_file.txt", "write")
-        graph.assign_right("root", "system_file.txt", "grant")
-        
-        # Verify root has permissions
-        assert graph.has_right("root", "system_file.txt", "read") == True
-        assert graph.has_right("root", "system_file.txt", "write") == True
-        assert graph.has_right("root", "system_file.txt", "grant") == True
-        
-        # Test permission hierarchy concept: admin should only get what root grants
-        # For now, test that admin starts with no permissions
-        assert graph.has_right("admin", "system_file.txt", "read") == False
-        assert graph.has_right("admin", "system_file.txt", "write") == False
-        assert graph.has_right("admin", "system_file.txt", "grant") == False
+    seed(graph, subjects=["root", "admin", "user", "guest"],
+         objects=["system_file.txt"])
+    
+    # Root has all permissions
+    graph.assign_right("root", "system_file.txt", "read")
+    graph.assign_right("root", "system_file.txt", "write")
+    graph.assign_right("root", "system_file.txt", "grant")
+    
+    # Verify root has permissions
+    assert graph.has_right("root", "system_file.txt", right)
+    
+    # Test permission hierarchy concept: admin should only get what root grants
+    # For now, test that admin starts with no permissions
+    assert not graph.has_right("admin", "system_file.txt", right)
 
-def test_circular_permission_prevention(client):
+def test_circular_permission_prevention(graph):
     """Test prevention of circular permission dependencies."""
     # Create subjects
-    client.post("/subject", json={"id": "alice"})
-    client.post("/subject", json={"id": "bob"})
-    client.post("/subject", json={"id": "charlie"})
-    client.post("/object", json={"id": "shared_resource.txt"})
-    
-    app = client.application
-    cluster = getattr(app, '_cluster', None)
-    if cluster and hasattr(cluster, '_graph'):
-        graph = cluster._graph
-        
-        # Set up initial permissions
-        graph.assign_right("alice", "shared_resource.txt", "grant")
-        graph.assign_right("alice", "shared_resource.txt", "read")
-        
-        # Give bob grant permission
-        graph.assign_right("bob", "shared_resource.txt", "grant")
-        
-        # Test that basic permissions work without circular dependencies
-        assert graph.has_right("alice", "shared_resource.txt", "grant") == True
-        assert graph.has_right("alice", "shared_resource.txt", "read") == True
-        assert graph.has_right("bob", "shared_resource.txt", "grant") == True
-        
-        # This creates a potential for circular dependencies in more complex scenarios
-        # The SPM model should handle this through proper cycle detection
-        # For now, we just verify the basic operations work
\ No newline at end of file
+    seed(graph, subjects=["alice", "bob", "charlie"],
+         objects=["shared_resource.txt"])
+    
+    # Set up initial permissions
+    graph.assign_right("alice", "shared_resource.txt", "grant")
+    graph.assign_right("alice", "shared_resource.txt", "read")
+    
+    # Give bob grant permission
+    graph.assign_right("bob", "shared_resource.txt", "grant")
+    
+    # Test that basic permissions work without circular dependencies
+    assert graph.has_right("alice", "shared_resource.txt", "grant") == True
+    assert graph.has_right("alice", "shared_resource.txt", "read") == True
+    assert graph.has_right("bob", "shared_resource.txt", "grant") == True
+    
+    # This creates a potential for circular dependencies in more complex scenarios
+    # The SPM model should handle this through proper cycle detection
+    # For now, we just verify the basic operations work
\ No newline at end of file
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from src.core.spm import SPMGraph
+from src.raft import node
+from src.raft.node import GraphCluster
+
+
+@pytest.fixture
+def raft_node():
+    """A GraphCluster with its state but no Raft transport.
+
+    Commands are applied with ``_doApply=True``, the path PySyncObj takes
+    when it replays a committed log entry.
+    """
+    cluster = GraphCluster.__new__(GraphCluster)
+    cluster._lock = threading.RLock()
+    cluster._graph = SPMGraph()
+    cluster._seen = OrderedDict()
+    return cluster
+
+
+def test_repeated_req_id_does_not_append_twice(raft_node, fake_fs):
+    raft_node.add_subject("alice", req_id="s1", _doApply=True)
+    raft_node.add_object("doc", req_id="o1", _doApply=True)
+    raft_node.assign_right("alice", "doc", "write", req_id="a1", _doApply=True)
+
+    assert raft_node.write_to_object("alice", "doc", "hi", req_id="w1", _doApply=True) is True
+    assert raft_node.write_to_object("alice", "doc", "hi", req_id="w1", _doApply=True) is True
+    assert fake_fs.appended == [("storage/doc", "hi\n")]
+
+    raft_node.write_to_object("alice", "doc", "hi", req_id="w2", _doApply=True)
+    assert len(fake_fs.appended) == 2
+
+
+def test_repeated_req_id_returns_cached_result(raft_node):
+    raft_node.add_subject("alice", req_id="s1", _doApply=True)
+    assert raft_node.assign_right("alice", "bob", "read", req_id="a1", _doApply=True) is True
+
+    # replaying the same id must not see the now-changed graph
+    raft_node.delete_subject("alice", req_id="d1", _doApply=True)
+    assert raft_node.assign_right("alice", "bob", "read", req_id="a1", _doApply=True) is True
+    assert raft_node.dump_graph()["edges"] == []
+
+
+def test_req_id_reused_for_another_op_still_applies(raft_node):
+    raft_node.add_subject("bob", req_id="k1", _doApply=True)
+    raft_node.delete_subject("bob", req_id="k1", _doApply=True)
+    assert raft_node._graph.kind("bob") is None
+
+
+def test_requests_without_id_always_apply(raft_node, fake_fs):
+    raft_node.add_subject("alice", _doApply=True)
+    raft_node.add_object("doc", _doApply=True)
+    raft_node.assign_right("alice", "doc", "write", _doApply=True)
+    raft_node.write_to_object("alice", "doc", "hi", _doApply=True)
+    raft_node.write_to_object("alice", "doc", "hi", _doApply=True)
+    assert len(fake_fs.appended) == 2
+    assert not raft_node._seen
+
+
+def test_oldest_req_id_is_evicted(raft_node, monkeypatch):
+    monkeypatch.setattr(node, "MAX_SEEN_REQUESTS", 2)
+    for req_id in ("r1", "r2", "r3"):
+        raft_node.add_subject(req_id, req_id=req_id, _doApply=True)
+    assert [req_id for req_id, _ in raft_node._seen] == ["r2", "r3"]
+
+    # a hit refreshes the id, so the next eviction takes r3 instead
+    raft_node.add_subject("r2", req_id="r2", _doApply=True)
+    raft_node.add_subject("r4", req_id="r4", _doApply=True)
+    assert [req_id for req_id, _ in raft_node._seen] == ["r2", "r4"]
+
+    # r1 was forgotten, so it applies again
+    raft_node.delete_subject("r1", _doApply=True)
+    raft_node.add_subject("r1", req_id="r1", _doApply=True)
+    assert raft_node._graph.kind("r1") == "subject"
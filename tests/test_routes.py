@@ -1,36 +1,77 @@
 import pytest
-from flask import Flask
 from unittest.mock import MagicMock
-from src.api.routes import register_routes
 
-@pytest.fixture
-def client():
+# Expected response bodies
+OK_ALICE = {"status": "ok", "id": "alice"}
+OK_ASSIGN = {"status": "ok", "src": "alice", "dst": "bob", "right": "read"}
+INVALID_OPERATION = {"error": "invalid operation"}
+MISSING_ID = {"error": "missing id"}
+
+@pytest.fixture(scope="module")
+def app():
+    from flask import Flask
+    from src.api.routes import register_routes
+
     app = Flask(__name__)
     # Mock the GraphCluster
-    mock_cluster = MagicMock()
-    register_routes(app, mock_cluster)
+    register_routes(app, MagicMock())
+    return app
+
+@pytest.fixture
+def client(app):
+    app.extensions["rac_cluster"].reset_mock()
     with app.test_client() as client:
         yield client
 
 def test_add_subject(client):
     response = client.post("/subject", json={"id": "alice"})
     assert response.status_code == 201
-    assert response.json == {"status": "ok", "id": "alice"}
+    assert response.json == OK_ALICE
 
 def test_delete_subject(client):
     client.post("/subject", json={"id": "alice"})
     response = client.delete("/subject/alice")
     assert response.status_code == 200
-    assert response.json == {"status": "ok", "id": "alice"}
+    assert response.json == OK_ALICE
 
 def test_assign_right(client):
     client.post("/subject", json={"id": "alice"})
     client.post("/subject", json={"id": "bob"})
     response = client.post("/assign", json={"src": "alice", "dst": "bob", "right": "read"})
     assert response.status_code == 201
-    assert response.json == {"status": "ok", "src": "alice", "dst": "bob", "right": "read"}
+    assert response.json == OK_ASSIGN
 
 def test_invalid_assign_right(client):
     response = client.post("/assign", json={"src": "alice", "dst": "bob", "right": "invalid_right"})
     assert response.status_code == 400
-    assert response.json == {"error": "invalid operation"}
+    assert response.json == INVALID_OPERATION
+
+def test_non_string_fields_are_rejected(app, client):
+    assert client.post("/subject", json={"id": 5}).status_code == 400
+    assert client.post("/object", json={"id": ["doc"]}).status_code == 400
+    response = client.post("/assign", json={"src": "alice", "dst": "bob", "right": ["read"]})
+    assert response.status_code == 400
+    assert response.json == INVALID_OPERATION
+    response = client.post("/write", json={"subject": "alice", "object": "doc", "content": {"a": 1}})
+    assert response.status_code == 400
+    assert not app.extensions["rac_cluster"].method_calls
+
+def test_non_json_body_is_rejected(client):
+    response = client.post("/subject", data="alice", content_type="text/plain")
+    assert response.status_code == 400
+    assert response.json == MISSING_ID
+
+def test_register_routes_again_swaps_cluster(app, client):
+    from src.api.routes import register_routes
+
+    other = MagicMock()
+    register_routes(app, other)
+    try:
+        client.post("/subject", json={"id": "alice"})
+        other.add_subject.assert_called_once_with("alice", req_id=None, sync=True)
+    finally:
+        register_routes(app, MagicMock())
+
+def test_idempotency_key_is_passed_as_req_id(app, client):
+    client.post("/subject", json={"id": "alice"}, headers={"Idempotency-Key": "k1"})
+    app.extensions["rac_cluster"].add_subject.assert_called_once_with("alice", req_id="k1", sync=True)
@@ -1,23 +1,23 @@
+import pickle
+
 import pytest
-from src.core.spm import SPMGraph
+from src.core.spm import Right, SPMGraph
 
 def test_add_and_delete_subject():
     graph = SPMGraph()
     graph.add_subject("alice")
-    assert "alice" in graph.g.nodes
-    assert graph.g.nodes["alice"]["type"] == "subject"
+    assert graph.kind("alice") == "subject"
 
     graph.delete_subject("alice")
-    assert "alice" not in graph.g.nodes
+    assert graph.kind("alice") is None
 
 def test_add_and_delete_object():
     graph = SPMGraph()
     graph.add_object("file1")
-    assert "file1" in graph.g.nodes
-    assert graph.g.nodes["file1"]["type"] == "object"
+    assert graph.kind("file1") == "object"
 
     graph.delete_object("file1")
-    assert "file1" not in graph.g.nodes
+    assert graph.kind("file1") is None
 
 def test_assign_right():
     graph = SPMGraph()
@@ -31,3 +31,136 @@ def test_invalid_right_assignment():
     graph.add_subject("alice")
     graph.add_object("file1")
     assert graph.assign_right("alice", "file1", "invalid_right") is False
+
+def test_to_dict_tracks_mutations():
+    graph = SPMGraph()
+    graph.add_subject("alice")
+    first = graph.to_dict()
+    assert graph.to_dict() is first
+
+    graph.add_object("file1")
+    graph.assign_right("alice", "file1", "read")
+    data = graph.to_dict()
+    assert data is not first
+    assert {"src": "alice", "dst": "file1", "rights": ["read"]} in data["edges"]
+
+def test_pickle_leaves_out_caches():
+    graph = SPMGraph()
+    graph.add_subject("alice")
+    graph.assign_right("alice", "bob", "read")
+    data = graph.to_dict()
+    assert graph.can_obtain("alice", "bob", "read") is True
+
+    restored = pickle.loads(pickle.dumps(graph))
+    assert restored._cached_dict is None
+    assert restored._closure is None
+    assert restored.can_obtain("alice", "bob", "read") is True
+    assert graph.to_dict() is data
+    assert restored.to_dict() == data
+
+def test_delete_subject_removes_incoming_edges():
+    graph = SPMGraph()
+    graph.add_subject("alice")
+    graph.add_subject("bob")
+    graph.assign_right("alice", "bob", "take")
+    graph.assign_right("bob", "alice", "take")
+    graph.assign_right("bob", "bob", "take")
+
+    graph.delete_subject("bob")
+    assert graph.has_right("alice", "bob", "take") is False
+    assert graph.to_dict()["edges"] == []
+    assert graph.radj == {"alice": set()}
+
+def test_grant_and_take_require_authority():
+    graph = SPMGraph()
+    for sid in ("alice", "bob", "eve"):
+        graph.add_subject(sid)
+    graph.assign_right("alice", "doc", "read")
+
+    # grant needs both "grant" and the granted right on the target
+    assert graph.grant("alice", "bob", "read", "doc") is False
+    graph.assign_right("alice", "doc", "grant")
+    assert graph.grant("alice", "bob", "read", "doc") is True
+    assert graph.grant("alice", "bob", "write", "doc") is False
+    assert graph.has_right("bob", "doc", "read") is True
+
+    # take needs "take" on the source, which must hold the right
+    assert graph.take("eve", "bob", "read", "doc") is False
+    graph.assign_right("eve", "bob", "take")
+    assert graph.take("eve", "bob", "read", "doc") is True
+    assert graph.take("eve", "bob", "write", "doc") is False
+    assert graph.has_right("eve", "doc", "read") is True
+
+def test_can_obtain_follows_take_and_grant():
+    graph = SPMGraph()
+    for sid in ("alice", "bob", "carol", "dave"):
+        graph.add_subject(sid)
+    graph.assign_right("carol", "doc", "read")
+    assert graph.can_obtain("carol", "doc", "read") is True
+    assert graph.can_obtain("alice", "doc", "read") is False
+
+    # alice -take-> bob -take-> carol, who holds read
+    graph.assign_right("alice", "bob", "take")
+    graph.assign_right("bob", "carol", "take")
+    assert graph.can_obtain("alice", "doc", "read") is True
+    assert graph.can_obtain("alice", "doc", "write") is False
+    assert graph.can_obtain("dave", "doc", "read") is False
+
+    # anyone who can hold grant + read on doc could hand it to dave
+    graph.assign_right("carol", "doc", "grant")
+    assert graph.can_obtain("dave", "doc", "read") is True
+
+
+def _delegated_grant_graph():
+    graph = SPMGraph()
+    for sid in ("s1", "s2", "eve"):
+        graph.add_subject(sid)
+    graph.assign_right("s1", "doc", "grant")
+    graph.assign_right("s2", "doc", "read")
+    return graph
+
+
+def test_can_obtain_through_delegated_grant():
+    # s1 can only grant; passing "grant" to s2 lets s2 hand out its read
+    assert _delegated_grant_graph().can_obtain("eve", "doc", "read") is True
+    assert _delegated_grant_graph().can_obtain("stranger", "doc", "read") is True
+
+    graph = _delegated_grant_graph()
+    assert graph.grant("s1", "s2", "grant", "doc") is True
+    assert graph.grant("s2", "eve", "read", "doc") is True
+    assert graph.has_right("eve", "doc", "read") is True
+
+
+def _granted_take_graph():
+    graph = SPMGraph()
+    for sid in ("s", "y", "eve"):
+        graph.add_subject(sid)
+    graph.assign_right("s", "y", Right.GRANT | Right.TAKE)
+    graph.assign_right("y", "doc", "read")
+    return graph
+
+
+def test_can_obtain_through_granted_take():
+    # s grants eve a take edge onto y, then eve takes y's read
+    assert _granted_take_graph().can_obtain("eve", "doc", "read") is True
+    assert _granted_take_graph().can_obtain("eve", "doc", "write") is False
+
+    graph = _granted_take_graph()
+    assert graph.grant("s", "eve", "take", "y") is True
+    assert graph.take("eve", "y", "read", "doc") is True
+    assert graph.has_right("eve", "doc", "read") is True
+
+
+def test_right_flags_combine(fake_fs):
+    graph = SPMGraph()
+    graph.add_subject("alice")
+    graph.add_subject("bob")
+    graph.add_object("doc")
+    assert graph.assign_right("alice", "doc", Right.READ | Right.WRITE | Right.GRANT) is True
+    assert graph.has_right("alice", "doc", "read") is True
+    assert graph.has_right("alice", "doc", Right.READ | Right.WRITE) is True
+
+    assert graph.grant("alice", "bob", Right.READ | Right.WRITE, "doc") is True
+    assert graph.has_right("bob", "doc", Right.READ | Right.WRITE) is True
+    assert graph.has_right("bob", "doc", Right.READ | Right.GRANT) is False
+    assert graph.assign_right("alice", "doc", "execute") is False
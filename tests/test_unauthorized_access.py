@@ -1,32 +1,4 @@
 import pytest
-from flask import Flask
-from unittest.mock import MagicMock
-from src.api.routes import register_routes
-from src.core.spm import SPMGraph
-
-@pytest.fixture
-def app_with_real_graph():
-    """Create Flask app with real SPMGraph for testing actual access control."""
-    app = Flask(__name__)
-    
-    # Mock cluster that uses real SPMGraph
-    mock_cluster = MagicMock()
-    mock_cluster._graph = SPMGraph()
-    
-    # Wire up the methods to use the real graph
-    mock_cluster.add_subject.side_effect = lambda sid, sync=True: mock_cluster._graph.add_subject(sid)
-    mock_cluster.add_object.side_effect = lambda oid, sync=True: mock_cluster._graph.add_object(oid)
-    mock_cluster.assign_right.side_effect = lambda src, dst, right, sync=True: mock_cluster._graph.assign_right(src, dst, right)
-    mock_cluster.write_to_object.side_effect = lambda sid, oid, content, sync=True: mock_cluster._graph.write_to_object(sid, oid, content)
-    mock_cluster.dump_graph.side_effect = lambda: mock_cluster._graph.to_dict()
-    
-    register_routes(app, mock_cluster)
-    return app
-
-@pytest.fixture
-def client(app_with_real_graph):
-    with app_with_real_graph.test_client() as client:
-        yield client
 
 def test_unauthorized_file_write(client):
     """Test that subjects without write permission cannot write to files."""